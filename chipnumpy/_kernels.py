@@ -0,0 +1,226 @@
+from typing import Dict
+from functools import lru_cache
+import numpy as np
+from chipnumpy.constants import FRAMERATE, AMPLITUDE_SCALE
+try:
+    from chipnumpy import _csynth
+    # If True, the optional C extension was compiled and sine waveforms are generated with it.
+    CSYNTH: bool = True
+except ImportError:
+    CSYNTH = False
+# Numba is only used if the C extension isn't available, so don't spend time importing it otherwise.
+NUMBA: bool = False
+if not CSYNTH:
+    try:
+        from numba import njit, prange
+        # If True, Numba is installed, the C extension isn't, and sine waveforms are generated with a JIT-compiled kernel.
+        NUMBA = True
+    except ImportError:
+        pass
+
+
+if NUMBA:
+    # The number of samples between re-seeds of the sine recurrence.
+    _SINE_BLOCK: int = 4096
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _sine_i16(step: float, amplitude: float, out: np.ndarray) -> None:
+        """
+        Generate a sine waveform as int16 samples with the recurrence `s[k] = 2cos(step) * s[k - 1] - s[k - 2]`.
+        Each block of samples is seeded with `sin()` to bound error drift, and the blocks are generated in parallel.
+
+        :param step: The phase step per sample in radians.
+        :param amplitude: The clamped amplitude.
+        :param out: The int16 numpy array that the samples will be written to.
+        """
+
+        scale = AMPLITUDE_SCALE * amplitude
+        coefficient = 2 * np.cos(step)
+        n = out.shape[0]
+        for block in prange((n + _SINE_BLOCK - 1) // _SINE_BLOCK):
+            start = block * _SINE_BLOCK
+            end = min(start + _SINE_BLOCK, n)
+            previous = np.sin(step * (start - 1))
+            current = np.sin(step * start)
+            for i in range(start, end):
+                out[i] = np.int16(scale * current)
+                previous, current = current, coefficient * current - previous
+
+
+def _tile_into(arr: np.ndarray, out: np.ndarray) -> None:
+    """
+    Repeat an array to fill a contiguous output array, without allocating an intermediate array.
+
+    :param arr: The array to repeat, e.g. one period of samples.
+    :param out: The array that will be filled.
+    """
+
+    n: int = arr.shape[0] * (out.shape[0] // arr.shape[0])
+    # Broadcast the array into each whole repetition.
+    out[:n].reshape(-1, arr.shape[0])[:] = arr
+    # Fill the remainder.
+    out[n:] = arr[:out.shape[0] - n]
+
+
+# The dtype of the samples generated by each waveform function.
+_DTYPES: Dict[str, type] = {"sine": np.int16 if CSYNTH or NUMBA else np.float32,
+                            "triangle": np.int16,
+                            "sawtooth": np.int16,
+                            "pulse": np.int16}
+
+
+def _to_bytes(arr: np.ndarray) -> bytes:
+    """
+    :param arr: A float32 numpy array, which will be modified in-place, or an int16 numpy array of samples.
+
+    :return: A byte array of int16 wav data.
+    """
+
+    # The samples are already int16s.
+    if arr.dtype == np.int16:
+        return arr.tobytes()
+    # Scale the waveform and convert it to int16s.
+    return np.multiply(arr, np.float32(AMPLITUDE_SCALE), out=arr).astype(np.int16).tobytes()
+
+
+def _sine(frequency: float, amplitude: float, n: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Generate a sine waveform.
+
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+    :param n: The number of samples.
+    :param out: If not None, the samples are written to this array, which must have a dtype of `_DTYPES["sine"]`.
+
+    :return: A numpy sine waveform: int16 samples if the C extension is compiled or Numba is installed, otherwise float32 values.
+    """
+
+    if out is None:
+        out = np.empty(n, dtype=_DTYPES["sine"])
+    if CSYNTH:
+        _csynth.sine(2 * np.pi * frequency / FRAMERATE, AMPLITUDE_SCALE * amplitude, out)
+    elif NUMBA:
+        _sine_i16(2 * np.pi * frequency / FRAMERATE, amplitude, out)
+    else:
+        # Wrap the range to the exact (non-integer) period in float64 so that every sample index is exact.
+        # The wrapped values are small, so they keep their precision when they're cast to float32.
+        exact_period: float = FRAMERATE / frequency
+        np.fmod(np.arange(0, n, dtype=np.float64), exact_period, out=out)
+        # Apply a sine.
+        np.multiply(out, np.float32(2 * np.pi / exact_period), out=out)
+        np.sin(out, out=out)
+        # Multiply by the amplitude.
+        np.multiply(out, np.float32(amplitude), out=out)
+    return out
+
+
+def _triangle(frequency: float, amplitude: float, n: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Generate a triangle waveform.
+
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+    :param n: The number of samples.
+    :param out: If not None, the samples are written to this int16 array.
+
+    :return: A numpy triangle waveform as int16 samples.
+    """
+
+    if out is None:
+        out = np.empty(n, dtype=np.int16)
+    _tile_into(_triangle_period(frequency, amplitude), out)
+    return out
+
+
+def _sawtooth(frequency: float, amplitude: float, n: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Generate a sawtooth waveform.
+
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+    :param n: The number of samples.
+    :param out: If not None, the samples are written to this int16 array.
+
+    :return: A numpy sawtooth waveform as int16 samples.
+    """
+
+    if out is None:
+        out = np.empty(n, dtype=np.int16)
+    _tile_into(_sawtooth_period(frequency, amplitude), out)
+    return out
+
+
+def _pulse(frequency: float, amplitude: float, n: int, duty_cycle: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Generate a pulse waveform.
+
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+    :param n: The number of samples.
+    :param duty_cycle: An integer that controls length of each pulse. Must be between 1 and 100.
+    :param out: If not None, the samples are written to this int16 array.
+
+    :return: A numpy pulse waveform as int16 samples.
+    """
+
+    if out is None:
+        out = np.empty(n, dtype=np.int16)
+    _tile_into(_pulse_period(frequency, amplitude, duty_cycle), out)
+    return out
+
+
+@lru_cache(maxsize=256)
+def _triangle_period(frequency: float, amplitude: float) -> np.ndarray:
+    """
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+
+    :return: One cached, read-only period of a triangle waveform as int16 samples.
+    """
+
+    period: int = int(FRAMERATE / frequency)
+    half_period: np.float32 = np.float32(period / 2)
+    samples: np.ndarray = np.subtract(np.arange(0, period, dtype=np.float32), half_period)
+    np.abs(samples, out=samples)
+    np.multiply(samples, np.float32(-2), out=samples)
+    np.add(samples, half_period - np.float32(1), out=samples)
+    np.multiply(samples, np.float32(amplitude / half_period), out=samples)
+    samples = np.multiply(samples, np.float32(AMPLITUDE_SCALE), out=samples).astype(np.int16)
+    samples.setflags(write=False)
+    return samples
+
+
+@lru_cache(maxsize=256)
+def _sawtooth_period(frequency: float, amplitude: float) -> np.ndarray:
+    """
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+
+    :return: One cached, read-only period of a sawtooth waveform as int16 samples.
+    """
+
+    period: int = int(FRAMERATE / frequency)
+    samples: np.ndarray = np.multiply(np.arange(0, period, dtype=np.float32), np.float32(frequency / FRAMERATE * 2))
+    np.subtract(samples, np.float32(1), out=samples)
+    np.multiply(samples, np.float32(amplitude), out=samples)
+    samples = np.multiply(samples, np.float32(AMPLITUDE_SCALE), out=samples).astype(np.int16)
+    samples.setflags(write=False)
+    return samples
+
+
+@lru_cache(maxsize=256)
+def _pulse_period(frequency: float, amplitude: float, duty_cycle: int) -> np.ndarray:
+    """
+    :param frequency: The frequency in Hz.
+    :param amplitude: The clamped amplitude (0 to 1).
+    :param duty_cycle: An integer that controls length of each pulse. Must be between 1 and 100.
+
+    :return: One cached, read-only period of a pulse waveform as int16 samples.
+    """
+
+    period: int = int(FRAMERATE / frequency)
+    high: np.int16 = np.int16(AMPLITUDE_SCALE * amplitude)
+    samples: np.ndarray = np.full(period, -high, dtype=np.int16)
+    samples[:int(duty_cycle * period / 100)] = high
+    samples.setflags(write=False)
+    return samples
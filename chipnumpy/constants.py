@@ -33,3 +33,5 @@ OCTAVES: Dict[int, float] = {0: 0.06,
                              6: 4,
                              7: 8,
                              8: 16}
+# The frequency of each note + octave string, e.g. `"F#4"`.
+NOTE_FREQUENCIES: Dict[str, float] = {f"{note}{octave}": NOTES[note] * OCTAVES[octave] for note in NOTES for octave in OCTAVES}
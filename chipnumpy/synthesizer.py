@@ -1,8 +1,26 @@
-from typing import Tuple, Union
+from typing import Iterable, List, Tuple, Union
+from numbers import Real
 from pathlib import Path
-from struct import pack
+from struct import Struct
 import numpy as np
-from chipnumpy.constants import FRAMERATE, AMPLITUDE_SCALE, NUM_CHANNELS, NUM_BITS, NOTES, OCTAVES
+from chipnumpy.constants import FRAMERATE, NUM_CHANNELS, NUM_BITS, NOTE_FREQUENCIES
+from chipnumpy._kernels import _DTYPES, _to_bytes, _sine, _triangle, _sawtooth, _pulse
+
+
+# The layout of a RIFF Wave header.
+_HEADER_STRUCT: Struct = Struct('<4sI8sIHHIIHH4sI')
+# The layout of the file length and data length fields of the header.
+_LEN_STRUCT: Struct = Struct('<I')
+
+
+def _clamp(amplitude: float) -> float:
+    """
+    :param amplitude: The amplitude.
+
+    :return: The amplitude clamped to be between 0 and 1.
+    """
+
+    return 0 if amplitude < 0 else 1 if amplitude > 1 else amplitude
 
 
 class Synthesizer:
@@ -10,66 +28,62 @@ class Synthesizer:
     Abstract base class for synthesizers.
     """
 
-    HEADER: bytes = pack('<4sI8sIHHIIHH4sI',
-                         b"RIFF",
-                         0,
-                         b"WAVEfmt ",
-                         NUM_BITS,
-                         1,
-                         NUM_CHANNELS,
-                         FRAMERATE,
-                         FRAMERATE * NUM_CHANNELS * NUM_BITS // 8,
-                         NUM_CHANNELS * NUM_BITS // 8,
-                         NUM_BITS,
-                         b"data",
-                         0)
-
-    def __init__(self, seed: float = None):
+    HEADER: bytearray = bytearray(_HEADER_STRUCT.pack(b"RIFF",
+                                                      0,
+                                                      b"WAVEfmt ",
+                                                      NUM_BITS,
+                                                      1,
+                                                      NUM_CHANNELS,
+                                                      FRAMERATE,
+                                                      FRAMERATE * NUM_CHANNELS * NUM_BITS // 8,
+                                                      NUM_CHANNELS * NUM_BITS // 8,
+                                                      NUM_BITS,
+                                                      b"data",
+                                                      0))
+
+    def __init__(self, seed: int = None):
         """
         :param seed: The random seed. This is used only in `noise()`. If None, the seed is random.
         """
 
-        if seed is None:
-            self._rng: np.random.RandomState = np.random.RandomState()
-        else:
-            self._rng = np.random.RandomState(seed)
+        self._rng: np.random.Generator = np.random.default_rng(seed)
 
     def sine(self, note: Union[str, float], amplitude: float, length: float) -> bytes:
         """
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as an int or float.
         :param amplitude: The amplitude (0 to 1).
         :param length: The length in seconds.
 
         :return A sine waveform.
         """
 
-        return Synthesizer._to_bytes(Synthesizer._sine(note=note, amplitude=amplitude), length=length)
+        return _to_bytes(_sine(Synthesizer._get_frequency(note), _clamp(amplitude), int(FRAMERATE * length)))
 
     def triangle(self, note: Union[str, float], amplitude: float, length: float) -> bytes:
         """
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as an int or float.
         :param amplitude: The amplitude (0 to 1).
         :param length: The length in seconds.
 
         :return A triangle waveform.
         """
 
-        return Synthesizer._to_bytes(Synthesizer._triangle(note=note, amplitude=amplitude), length=length)
+        return _to_bytes(_triangle(Synthesizer._get_frequency(note), _clamp(amplitude), int(FRAMERATE * length)))
 
     def sawtooth(self, note: Union[str, float], amplitude: float, length: float) -> bytes:
         """
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as an int or float.
         :param amplitude: The amplitude (0 to 1).
         :param length: The length in seconds.
 
         :return A sawtooth waveform.
         """
 
-        return Synthesizer._to_bytes(Synthesizer._sawtooth(note=note, amplitude=amplitude), length=length)
+        return _to_bytes(_sawtooth(Synthesizer._get_frequency(note), _clamp(amplitude), int(FRAMERATE * length)))
 
     def pulse(self, note: Union[str, float], amplitude: float, length: float, duty_cycle: int = 50) -> bytes:
         """
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as an int or float.
         :param amplitude: The amplitude (0 to 1).
         :param length: The length in seconds.
         :param duty_cycle: An integer that controls length of each pulse. Must be between 1 and 100.
@@ -77,18 +91,52 @@ class Synthesizer:
         :return A pulse waveform.
         """
 
-        return Synthesizer._to_bytes(Synthesizer._pulse(note=note, amplitude=amplitude, duty_cycle=duty_cycle), length=length)
+        return _to_bytes(_pulse(Synthesizer._get_frequency(note), _clamp(amplitude), int(FRAMERATE * length), duty_cycle))
 
     def noise(self, note: Union[str, float], amplitude: float, length: float) -> bytes:
         """
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as an int or float.
         :param amplitude: The amplitude (0 to 1).
         :param length: The length in seconds.
 
         :return A noise waveform using random values between -1 and 1.
         """
 
-        return Synthesizer._to_bytes(self._noise(note=note, amplitude=amplitude), length=length)
+        return _to_bytes(self._noise(note=note, amplitude=amplitude, length=length))
+
+    def render(self, notes: List[Tuple[Union[str, float], float, float]], waveform: str = "sine", duty_cycle: int = 50) -> bytes:
+        """
+        Generate a sequence of notes as one waveform. Except for noise, each note is written directly into one output buffer, which avoids concatenating per-note buffers.
+
+        :param notes: A list of tuples: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as an int or float; the amplitude (0 to 1); and the length in seconds.
+        :param waveform: The type of waveform: `"sine"`, `"triangle"`, `"sawtooth"`, `"pulse"`, or `"noise"`.
+        :param duty_cycle: An integer that controls length of each pulse. Must be between 1 and 100. This is used only if `waveform == "pulse"`.
+
+        :return A waveform of all of the notes in order.
+        """
+
+        if waveform == "noise":
+            return b"".join([self.noise(note=note, amplitude=amplitude, length=length) for note, amplitude, length in notes])
+        elif waveform not in ["sine", "triangle", "sawtooth", "pulse"]:
+            raise Exception(f"Invalid waveform: {waveform}")
+        # Get the start and end sample of each note.
+        ns: List[int] = [int(FRAMERATE * length) for note, amplitude, length in notes]
+        offsets: np.ndarray = np.cumsum([0] + ns)
+        # Write each note into a slice of a single waveform.
+        samples: np.ndarray = np.empty(offsets[-1], dtype=_DTYPES[waveform])
+        for i in range(len(notes)):
+            frequency: float = Synthesizer._get_frequency(notes[i][0])
+            amplitude: float = _clamp(notes[i][1])
+            note_samples: np.ndarray = samples[offsets[i]: offsets[i + 1]]
+            if waveform == "sine":
+                _sine(frequency, amplitude, ns[i], note_samples)
+            elif waveform == "triangle":
+                _triangle(frequency, amplitude, ns[i], note_samples)
+            elif waveform == "sawtooth":
+                _sawtooth(frequency, amplitude, ns[i], note_samples)
+            else:
+                _pulse(frequency, amplitude, ns[i], duty_cycle, note_samples)
+        return _to_bytes(samples)
 
     @staticmethod
     def to_wav(data: bytes) -> bytes:
@@ -100,22 +148,34 @@ class Synthesizer:
         :return: A fully formed Wave object with correct file header, ready to be saved to disk or used directly.
         """
 
-        length: int = len(data)
-        # Set the file length.
-        Synthesizer.HEADER[4:8] = pack('<I', length + 36)
-        # Set the data length.
-        Synthesizer.HEADER[-4:] = pack('<I', length)
-        wav = bytearray()
-        wav.extend(Synthesizer.HEADER)
-        wav.extend(data)
-        return bytes(wav)
+        return b"".join((Synthesizer._get_header(length=len(data)), data))
 
     @staticmethod
-    def write(data: bytes, path: Union[str, Path]) -> None:
+    def to_wav_into(data: bytes, out: bytearray) -> int:
         """
-        Add a RIFF Wave header to raw PCM data, and save to disk.
+        Add a RIFF standard Wave header to raw PCM data and write the result into a preallocated buffer.
+        Reusing the same buffer is faster than calling `to_wav()` when converting many waveforms.
 
         :param data: Raw PCM data as a byte array.
+        :param out: The buffer. Its length must be at least the length of `data` plus 44 bytes for the header.
+
+        :return: The number of bytes written to the start of `out`.
+        """
+
+        header_length: int = len(Synthesizer.HEADER)
+        length: int = header_length + len(data)
+        if len(out) < length:
+            raise Exception(f"Buffer is too small: {len(out)} < {length}")
+        Synthesizer._pack_header_into(out=out, length=len(data))
+        out[header_length:length] = data
+        return length
+
+    @staticmethod
+    def write(data: Union[bytes, Iterable[bytes]], path: Union[str, Path]) -> None:
+        """
+        Add a RIFF Wave header to raw PCM data, and save to disk.
+
+        :param data: Raw PCM data as either a byte array or an iterable of byte arrays, which will be written in order.
         :param path: The path to the output file as either a string or a `Path`.
         """
 
@@ -129,139 +189,79 @@ class Synthesizer:
         # Create the directory.
         if not p.parent.exists():
             p.parent.mkdir(parents=True)
-        # Write the data.
-        p.write_bytes(data)
-
-    @staticmethod
-    def _to_bytes(arr: np.ndarray, length: float) -> bytes:
-        """
-        :param arr: A float64 numpy array.
-        :param length: The length of the waveform.
-
-        :return: A byte array of int16 wav data.
-        """
-
-        # Get the empty samples array.
-        samples: np.ndarray = np.zeros(shape=int(FRAMERATE * length), dtype=np.int16)
-        # Get a chunk of int16s.
-        int16s: np.ndarray = (arr * AMPLITUDE_SCALE).astype(np.int16)
-        # Drop in the samples.
-        i = 0
-        while i < samples.shape[0]:
-            if i + int16s.shape[0] > samples.shape[0]:
-                samples[i:] = int16s[:samples.shape[0] - i]
-            else:
-                samples[i: i + int16s.shape[0]] = int16s
-            i += int16s.shape[0]
-        return samples.tobytes()
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = [data]
+        with open(p, "wb", buffering=1 << 20) as f:
+            # Reserve space for the header.
+            f.write(Synthesizer.HEADER)
+            # Stream the data.
+            length: int = 0
+            for chunk in data:
+                f.write(chunk)
+                length += len(chunk)
+            # Write the header now that the length of the data is known.
+            f.seek(0)
+            f.write(Synthesizer._get_header(length=length))
 
     @staticmethod
-    def _sine(note: Union[str, float], amplitude: float) -> np.ndarray:
+    def _get_header(length: int) -> bytearray:
         """
-        Generate a sine waveform.
+        :param length: The length of the raw PCM data in bytes.
 
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or the frequency in Hz as a float.
-        :param amplitude: The amplitude (0 to 1).
-
-        :return: A numpy sine waveform.
-        """
-
-        frequency, period, amplitude, arr = Synthesizer._start(note=note, amplitude=amplitude)
-        # Get the range and convert to float64.
-        arr: np.ndarray = np.arange(0, period).astype(np.float64)
-        # Apply a sine.
-        np.sin(2 * np.pi * frequency * (arr % period) / FRAMERATE, out=arr)
-        # Multiply by the amplitude.
-        np.multiply(arr, amplitude, out=arr)
-        return arr
-
-    @staticmethod
-    def _triangle(note: Union[str, float], amplitude: float) -> np.ndarray:
-        """
-        Generate a triangle waveform.
-
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a float.
-        :param amplitude: The amplitude (0 to 1).
-
-        :return: A numpy triangle waveform.
-        """
-
-        frequency, period, amplitude, arr = Synthesizer._start(note=note, amplitude=amplitude)
-        half_period: float = period / 2
-        return (amplitude / half_period) * (half_period - np.abs(arr % period - half_period) * 2 - 1)
-
-    @staticmethod
-    def _sawtooth(note: Union[str, float], amplitude: float) -> np.ndarray:
-        """
-        Generate a sawtooth waveform.
-
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a float.
-        :param amplitude: The amplitude (0 to 1).
-
-        :return: A numpy sawtooth waveform.
+        :return: A RIFF Wave header for the data.
         """
 
-        frequency, period, amplitude, arr = Synthesizer._start(note=note, amplitude=amplitude)
-        return amplitude * (frequency * (arr % period / FRAMERATE) * 2 - 1)
+        header: bytearray = bytearray(len(Synthesizer.HEADER))
+        Synthesizer._pack_header_into(out=header, length=length)
+        return header
 
     @staticmethod
-    def _pulse(note: Union[str, float], amplitude: float, duty_cycle: int = 50) -> np.ndarray:
+    def _pack_header_into(out: bytearray, length: int) -> None:
         """
-        Generate a pulse waveform.
+        Write a RIFF Wave header to the start of a buffer. The shared header template is never modified.
 
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a float.
-        :param amplitude: The amplitude (0 to 1).
-        :param duty_cycle: An integer that controls length of each pulse. Must be between 1 and 100.
-
-        :return: A numpy pulse waveform.
+        :param out: The buffer.
+        :param length: The length of the raw PCM data in bytes.
         """
 
-        frequency, period, amplitude, arr = Synthesizer._start(note=note, amplitude=amplitude)
-        duty_cycle = int(duty_cycle * period / 100)
-        return amplitude * ((arr < duty_cycle).astype(int) * 2 - 1)
+        out[:len(Synthesizer.HEADER)] = Synthesizer.HEADER
+        # Set the file length.
+        _LEN_STRUCT.pack_into(out, 4, length + 36)
+        # Set the data length.
+        _LEN_STRUCT.pack_into(out, 40, length)
 
-    def _noise(self, note: Union[str, float], amplitude: float) -> np.ndarray:
+    def _noise(self, note: Union[str, float], amplitude: float, length: float) -> np.ndarray:
         """
         Generate a noise waveform using random values between -1 and 1.
 
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as an int or float.
         :param amplitude: The amplitude (0 to 1).
+        :param length: The length in seconds.
 
         :return: A numpy noise waveform.
         """
 
         frequency: float = Synthesizer._get_frequency(note=note)
         period: int = int(FRAMERATE / frequency)
-        arr: np.ndarray = self._rng.uniform(-1, 1, size=period)
-        np.multiply(arr, amplitude, out=arr)
-        return arr
+        # Get one period of random values between 0 and 1 and scale them to be between -amplitude and amplitude.
+        arr: np.ndarray = self._rng.random(period, dtype=np.float32)
+        np.multiply(arr, np.float32(2 * amplitude), out=arr)
+        np.subtract(arr, np.float32(amplitude), out=arr)
+        # Repeat the period for the length of the waveform.
+        return np.resize(arr, int(FRAMERATE * length))
 
     @staticmethod
     def _get_frequency(note: Union[str, float]) -> float:
         """
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a float.
+        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a real number, e.g. an int, float, or numpy scalar.
 
         :return: A frequency in Hz as a float.
         """
 
         if isinstance(note, str):
-            return NOTES[note[:-1]] * OCTAVES[int(note[-1])]
-        elif isinstance(note, float):
-            return note
+            return NOTE_FREQUENCIES[note]
+        # Accept any real number, including numpy scalars, but not bools.
+        elif isinstance(note, Real) and not isinstance(note, bool):
+            return float(note)
         else:
             raise Exception(f"Invalid note: {note}")
-
-    @staticmethod
-    def _start(note: Union[str, float], amplitude: float) -> Tuple[float, int, float, np.ndarray]:
-        """
-        Generate data used by most waveform types.
-
-        :param note: Either a note expressed as a note + octave string, e.g. `"F#4"`, or a frequency in Hz as a float.
-        :param amplitude: The amplitude (0 to 1).
-
-        :return: Tuple: The frequency in Hz, the period as an int, the clamped amplitude, and a numpy array of length `period`.
-        """
-
-        frequency: float = Synthesizer._get_frequency(note=note)
-        period: int = int(FRAMERATE / frequency)
-        return frequency, period, 0 if amplitude < 0 else 1 if amplitude > 1 else amplitude, np.arange(0, period).astype(np.float64)
@@ -4,10 +4,9 @@ from chipnumpy.synthesizer import Synthesizer
 
 length = 0.5
 amplitude = 0.1
-data = bytearray()
 synthesizer = Synthesizer()
-for note in ["C4", "D4", "E4", "F4", "G4", "A4", "B4", "C5"]:
-    data.extend(synthesizer.sawtooth(note=note, amplitude=amplitude, length=length))
+data = synthesizer.render(notes=[(note, amplitude, length) for note in ["C4", "D4", "E4", "F4", "G4", "A4", "B4", "C5"]],
+                          waveform="sawtooth")
 pygame.mixer.init()
 sound = pygame.mixer.Sound(data)
 sound.play()
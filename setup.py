@@ -1,5 +1,5 @@
 from pathlib import Path
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
 
 
 setup(
@@ -22,7 +22,10 @@ setup(
         'Programming Language :: Python :: 3.8'
     ],
     packages=find_packages(),
+    # The C extension is optional. If it can't be compiled, the numpy implementation is used.
+    ext_modules=[Extension('chipnumpy._csynth', sources=['chipnumpy/_csynth.c'], optional=True)],
     include_package_data=True,
     keywords='audio chiptune synthesizer waveform',
-    install_requires=['numpy'],
+    install_requires=['numpy>=1.17'],
+    extras_require={'numba': ['numba']},
 )